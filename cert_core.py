@@ -0,0 +1,154 @@
+"""
+Shared certificate-generation primitives.
+
+Both the CLI (generate_certificates.py) and the Streamlit GUI
+(certificate_gui.py) follow the same skeleton: escape values, render
+the template in one pass, compile with pdflatex. This module holds that
+skeleton once so fixes and optimizations land in one place.
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+
+# Directories shared by the CLI and the GUI
+LOGOS_DIR = 'logos'
+PDF_CACHE_DIR = 'pdf_cache'
+
+# Translation table for LaTeX special characters, built once at import
+# time; str.translate makes a single pass instead of one str.replace
+# pass per character
+_LATEX_TRANS = str.maketrans({
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+})
+
+# Matches the <<PLACEHOLDER>> tokens used in the certificate template
+PLACEHOLDER_RE = re.compile(r'<<[A-Z0-9_]+>>')
+
+# Characters replaced with '_' when deriving filenames from names
+_NON_WORD_RE = re.compile(r'\W')
+
+# Macros whose resolution needs an extra pdflatex pass; when present,
+# the first pass runs with -draftmode (no PDF shipout)
+REF_MACRO_RE = re.compile(r'\\(ref|pageref|cite|tableofcontents|bibliography)\b')
+
+
+def escape_latex(text):
+    """Escape special LaTeX characters in the given text."""
+    return text.translate(_LATEX_TRANS) if text else ""
+
+
+def render_template(template, replacements):
+    """Substitute placeholder tokens in the template from replacements.
+
+    A single re.sub pass replaces every token at once instead of one
+    full-string str.replace pass per placeholder; unknown tokens are
+    left untouched.
+    """
+    return PLACEHOLDER_RE.sub(
+        lambda m: replacements.get(m.group(0), m.group(0)), template
+    )
+
+
+def safe_base_filename(participant_name):
+    """Filesystem-safe base name for a participant's certificate files."""
+    return f'certificate_{_NON_WORD_RE.sub("_", participant_name).upper()}'
+
+
+def needs_rerun(log_file):
+    """Check whether a pdflatex log asks for another pass."""
+    try:
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+            return 'rerun' in f.read().lower()
+    except OSError:
+        return False
+
+
+def logos_fingerprint():
+    """Fingerprint of the logos directory contents, for cache keys."""
+    logo_dir = Path(LOGOS_DIR)
+    if not logo_dir.exists():
+        return ()
+    with os.scandir(logo_dir) as it:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime)
+            for entry in it if entry.is_file()
+        ))
+
+
+def pdf_cache_path(content):
+    """Cache location for a certificate rendered from the given source.
+
+    The key hashes the fully rendered LaTeX plus the logo fingerprint,
+    so any change to the template, config, participant name or logo
+    files produces a different entry. Defined here once because the CLI
+    and the GUI share the pdf_cache/ directory: the key contract must
+    not diverge between them.
+    """
+    import hashlib
+
+    key = hashlib.blake2b(
+        (content + repr(logos_fingerprint())).encode('utf-8')
+    ).hexdigest()
+    cache_dir = Path(PDF_CACHE_DIR)
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir / f'{key}.pdf'
+
+
+def run_pdflatex_passes(tex_file, output_dir, cwd='.', fmt_file=None):
+    """Compile tex_file with pdflatex, avoiding needless full passes.
+
+    When the source uses cross-reference macros, a -draftmode pass (no
+    PDF shipout, so no font embedding or image inclusion) resolves them
+    first. The real compile then reruns only if the log still asks for
+    it (e.g. tikz page anchors); plain certificates resolve in a single
+    full pass. Stdout goes to /dev/null: batchmode pdflatex still emits
+    kilobytes of font chatter per run that nothing reads on success,
+    and any diagnostics worth showing end up in the .log and on stderr.
+    Returns the CompletedProcess of the last run.
+    """
+    tex_file = Path(tex_file)
+    # halt-on-error stops a broken compile at the first error instead of
+    # grinding through the rest of the document; shell escape is never
+    # needed for certificates, so keep it off explicitly
+    base_cmd = [
+        'pdflatex', '-interaction=batchmode', '-halt-on-error',
+        '-no-shell-escape', f'-output-directory={output_dir}'
+    ]
+    if fmt_file:
+        base_cmd.append(f'-fmt={fmt_file}')
+
+    try:
+        has_refs = bool(REF_MACRO_RE.search(tex_file.read_text(encoding='utf-8', errors='replace')))
+    except OSError:
+        has_refs = False
+
+    if has_refs:
+        result = subprocess.run(
+            [*base_cmd, '-draftmode', str(tex_file)],
+            cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if result.returncode != 0:
+            return result
+
+    result = None
+    for _ in range(2):
+        result = subprocess.run(
+            [*base_cmd, str(tex_file)],
+            cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if result.returncode != 0:
+            break
+        if not needs_rerun(Path(output_dir) / f'{tex_file.stem}.log'):
+            break
+    return result
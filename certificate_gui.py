@@ -4,18 +4,30 @@ Certificate Generator GUI
 A Streamlit-based GUI for generating LaTeX certificates with logo upload and configuration management.
 """
 
+import functools
 import os
 import shutil
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
 
+from cert_core import (
+    LOGOS_DIR,
+    PDF_CACHE_DIR,
+    escape_latex,
+    logos_fingerprint,
+    pdf_cache_path,
+    render_template,
+    run_pdflatex_passes,
+    safe_base_filename,
+)
+
 # Configuration file paths
 CONFIG_FILE = "workshop_info.txt"
 TEMPLATE_FILE = "certificate.tex"
-LOGOS_DIR = "logos"
 PDFS_DIR = "pdfs"
 
 def ensure_directories():
@@ -23,56 +35,95 @@ def ensure_directories():
     os.makedirs(LOGOS_DIR, exist_ok=True)
     os.makedirs(PDFS_DIR, exist_ok=True)
 
+@st.cache_data(show_spinner=False)
+def _load_template(path, mtime):
+    """Read the certificate template, cached until the file changes on disk.
+
+    The mtime is part of the cache key so edits to the template invalidate
+    the cached copy automatically.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+@st.cache_data(show_spinner=False)
+def _parse_workshop_config(path, mtime):
+    """Parse the workshop config file, cached until the file changes on disk."""
+    lines = [line.strip() for line in Path(path).read_text(encoding='utf-8').splitlines()]
+
+    # Locate the participant-section sentinel once
+    sep = next(
+        (i for i, line in enumerate(lines)
+         if line.startswith('===') and 'Participant' in line),
+        len(lines)
+    )
+
+    config = {
+        key.strip(): value.strip()
+        for key, value in (
+            line.split('=', 1) for line in lines[:sep]
+            if line and not line.startswith('#') and '=' in line
+        )
+    }
+    participants = [
+        line for line in lines[sep + 1:]
+        if line and not line.startswith(('#', '=='))
+    ]
+
+    return config, participants
+
 def read_workshop_config():
     """Read workshop configuration from file."""
     if not os.path.exists(CONFIG_FILE):
         return get_default_config(), []
 
-    config = {}
-    participants = []
-    in_participants_section = False
-
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-
-                if line.startswith('===') and 'Participant' in line:
-                    in_participants_section = True
-                    continue
-
-                if '=' in line and not in_participants_section:
-                    key, value = line.split('=', 1)
-                    config[key.strip()] = value.strip()
-                elif in_participants_section and line and not line.startswith('=='):
-                    participants.append(line.strip())
-
-        return config, participants
-
+        return _parse_workshop_config(CONFIG_FILE, os.path.getmtime(CONFIG_FILE))
     except Exception as e:
         st.error(f"Error reading {CONFIG_FILE}: {str(e)}")
         return get_default_config(), []
 
 def save_workshop_config(config, participants):
-    """Save workshop configuration to file."""
+    """Save workshop configuration to file.
+
+    Rendered fully in memory first so an unchanged configuration skips
+    the rewrite, preserving the file's mtime and the caches keyed on it.
+    """
+    lines = [
+        "# Certificate Generation Configuration",
+        "# This file contains both participant names and certificate details",
+        "# Lines starting with '#' are comments and will be ignored",
+        "",
+        "# === Certificate Details (applied to all certificates) ===",
+    ]
+    lines.extend(
+        f"{key}={value}" for key, value in config.items()
+        if key not in ['participants']
+    )
+    lines.extend([
+        "",
+        "=== Participant List ===",
+        "# Add one participant name per line below",
+        "# Format: FirstName LastName",
+        "",
+    ])
+    lines.extend(participants)
+    new_content = "\n".join(lines) + "\n"
+
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            f.write("# Certificate Generation Configuration\n")
-            f.write("# This file contains both participant names and certificate details\n")
-            f.write("# Lines starting with '#' are comments and will be ignored\n\n")
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                if f.read() == new_content:
+                    return True
+        except OSError:
+            pass
 
-            f.write("# === Certificate Details (applied to all certificates) ===\n")
-            for key, value in config.items():
-                if key not in ['participants']:
-                    f.write(f"{key}={value}\n")
+        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+            f.write(new_content)
 
-            f.write("\n=== Participant List ===\n")
-            f.write("# Add one participant name per line below\n")
-            f.write("# Format: FirstName LastName\n\n")
-            for participant in participants:
-                f.write(f"{participant}\n")
+        # Drop the cached parse explicitly rather than relying on the
+        # mtime key alone, which can miss rewrites within one timestamp
+        # granule on coarse filesystems
+        _parse_workshop_config.clear()
 
         return True
     except Exception as e:
@@ -97,28 +148,77 @@ def get_default_config():
         'PARTNER_LOGO': 'logos/partner.png'
     }
 
-def escape_latex(text):
-    """Escape special LaTeX characters in the given text."""
-    if not text:
-        return ""
-
-    replacements = {
-        '\\': '\textbackslash{}',
-        '&': '\&',
-        '%': '\%',
-        '$': '\$',
-        '#': '\#',
-        '_': '\_',
-        '{': '\{',
-        '}': '\}',
-        '~': '\textasciitilde{}',
-        '^': '\textasciicircum{}',
-    }
+@st.cache_resource(show_spinner=False)
+def _preamble_format(template_mtime):
+    """Precompile the template preamble into a .fmt with mylatexformat.
+
+    Package loading dominates a one-page compile, so dumping the
+    preamble once lets every certificate start from the predigested
+    format. Returns the .fmt path, or None when the dump fails (for
+    example, mylatexformat is not installed), in which case compiles
+    fall back to plain pdflatex. The mtime key rebuilds the format
+    when the template changes.
+    """
+    import tempfile
+
+    fmt_dir = Path(tempfile.mkdtemp(prefix='cert_fmt_'))
+    result = subprocess.run(
+        ['pdflatex', '-ini', '-interaction=nonstopmode', '-jobname=certfmt',
+         f'-output-directory={fmt_dir}',
+         '&pdflatex', 'mylatexformat.ltx', TEMPLATE_FILE],
+        cwd='.',
+        capture_output=True,
+        text=True
+    )
+    fmt_file = fmt_dir / 'certfmt.fmt'
+    if result.returncode == 0 and fmt_file.exists():
+        return str(fmt_file)
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _tectonic_path():
+    """Locate the tectonic engine once per process, if installed."""
+    return shutil.which('tectonic')
+
+def _run_pdflatex(tex_file, output_dir, cwd='.'):
+    """Compile tex_file, avoiding needless full passes.
+
+    Prefers tectonic when installed: it caches fonts and support files
+    itself and decides internally whether a rerun is needed, so a
+    single invocation suffices. Tectonic resolves relative inputs
+    against the .tex file's directory rather than the cwd, so it is
+    only used when that directory holds a logos/ copy (the preview
+    workdir does; pdfs/ does not), and a failed run falls through to
+    pdflatex rather than giving up. The pdflatex path uses the
+    precompiled preamble format when available; when the source uses
+    cross-reference macros, a -draftmode pass (no PDF shipout, so no
+    font embedding or image inclusion) resolves them first, and the
+    real compile then reruns only if the log still asks for it (e.g.
+    tikz page anchors). Plain certificates resolve in a single full
+    pass. Returns the CompletedProcess of the last run.
+    """
+    tectonic = _tectonic_path()
+    if tectonic and (Path(tex_file).parent / LOGOS_DIR).is_dir():
+        result = subprocess.run(
+            [tectonic, '--keep-logs', '--outdir', str(output_dir), str(tex_file)],
+            cwd=cwd,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode == 0:
+            return result
+        # Engine trouble (e.g. no bundle cached yet on a first offline
+        # run) should not fail the compile while pdflatex works
 
-    for old, new in replacements.items():
-        text = text.replace(old, new)
+    fmt_file = None
+    if os.path.exists(TEMPLATE_FILE):
+        fmt_file = _preamble_format(os.path.getmtime(TEMPLATE_FILE))
 
-    return text
+    result = run_pdflatex_passes(tex_file, output_dir, cwd, fmt_file)
+    if result.returncode != 0 and fmt_file:
+        # The format can go stale or misbehave; retry from scratch
+        result = run_pdflatex_passes(tex_file, output_dir, cwd, None)
+    return result
 
 def generate_trainer_table(config):
     """Generate LaTeX table for 1-4 trainers with dynamic column widths."""
@@ -127,10 +227,10 @@ def generate_trainer_table(config):
     for i in range(1, 5):
         if config.get(f'TRAINER{i}', '').strip() or config.get(f'TRAINER_TITLE_{i}', '').strip():
             num_trainers = i
-    
+
     if num_trainers == 0:
         return ""
-    
+
     # Collect non-empty trainers
     trainers = []
     for i in range(1, num_trainers + 1):
@@ -138,10 +238,19 @@ def generate_trainer_table(config):
         title = config.get(f'TRAINER_TITLE_{i}', '').strip()
         if name or title:  # Include if either name or title is not empty
             trainers.append((name, title))
-    
+
     if not trainers:
         return ""
-    
+
+    return _build_trainer_table(tuple(trainers))
+
+@functools.lru_cache(maxsize=32)
+def _build_trainer_table(trainers):
+    """Build the LaTeX trainer table for a tuple of (name, title) pairs.
+
+    Pure over its argument, so the result is memoized - batch generation
+    calls this once per config instead of once per participant.
+    """
     # Generate table rows
     name_cells = []
     title_cells = []
@@ -178,36 +287,88 @@ def generate_trainer_table(config):
     
     return "\n".join(table)
 
+@st.cache_resource(show_spinner=False)
+def _preview_workdir(fingerprint):
+    """Per-process working directory for compiling previews.
+
+    Created once with a copy of logos/ and reused across reruns; the
+    fingerprint key rebuilds it only when the logo files change.
+    """
+    import tempfile
+
+    workdir = Path(tempfile.mkdtemp(prefix='cert_preview_'))
+    logo_dir = Path(LOGOS_DIR)
+    if logo_dir.exists():
+        shutil.copytree(logo_dir, workdir / 'logos')
+    else:
+        (workdir / 'logos').mkdir()
+    return workdir
+
 def generate_certificate_preview(participant_name, config):
     """Generate a preview of the certificate template."""
     try:
-        with open(TEMPLATE_FILE, 'r', encoding='utf-8') as file:
-            content = file.read()
+        return _render_certificate_latex(
+            participant_name,
+            tuple(sorted(config.items())),
+            os.path.getmtime(TEMPLATE_FILE)
+        )
+    except Exception as e:
+        return f"Error generating preview: {str(e)}"
 
-        trainer_table = generate_trainer_table(config)
+@st.cache_data(show_spinner=False)
+def _render_certificate_latex(participant_name, config_items, template_mtime):
+    """Render the filled LaTeX source for one participant.
 
-        replacements = {
-            '<<PARTICIPANT_NAME>>': escape_latex(participant_name),
-            '<<CERTIFICATE_NAME>>': escape_latex(config.get('CERTIFICATE_NAME', 'Certificate of Achievement')),
-            '<<WORKSHOP_NAME>>': escape_latex(config.get('WORKSHOP_NAME', 'Workshop')),
-            '<<START_DATE>>': escape_latex(config.get('START_DATE', '')),
-            '<<END_DATE>>': escape_latex(config.get('END_DATE', '')),
-            '<<YEAR>>': escape_latex(config.get('YEAR', '')),
-            '<<FOOTER_TEXT>>': escape_latex(config.get('FOOTER_TEXT', '')),
-            '<<PARTNER_LOGO>>': config.get('PARTNER_LOGO', 'logos/partner.png'),
-            '<<TRAINER_TABLE>>': trainer_table
-        }
+    Cached on (participant, config, template mtime), so reruns that
+    change none of them skip the escaping and substitution work.
+    """
+    config = dict(config_items)
+    content = _load_template(TEMPLATE_FILE, template_mtime)
 
-        for i in range(1, 5):
-            replacements[f'<<TRAINER{i}>>'] = escape_latex(config.get(f'TRAINER{i}', ''))
-            replacements[f'<<TRAINER_TITLE_{i}>>'] = escape_latex(config.get(f'TRAINER_TITLE_{i}', ''))
+    replacements = {
+        **_build_config_replacements(config),
+        '<<PARTICIPANT_NAME>>': escape_latex(participant_name),
+    }
 
-        for placeholder, value in replacements.items():
-            content = content.replace(placeholder, value)
+    return render_template(content, replacements)
 
-        return content
-    except Exception as e:
-        return f"Error generating preview: {str(e)}"
+def _build_config_replacements(config):
+    """Build the placeholder dict for everything driven by the config.
+
+    The participant name is the only placeholder that varies within a
+    batch, so callers build this once and overlay the name per
+    certificate.
+    """
+    replacements = {
+        '<<CERTIFICATE_NAME>>': escape_latex(config.get('CERTIFICATE_NAME', 'Certificate of Achievement')),
+        '<<WORKSHOP_NAME>>': escape_latex(config.get('WORKSHOP_NAME', 'Workshop')),
+        '<<START_DATE>>': escape_latex(config.get('START_DATE', '')),
+        '<<END_DATE>>': escape_latex(config.get('END_DATE', '')),
+        '<<YEAR>>': escape_latex(config.get('YEAR', '')),
+        '<<FOOTER_TEXT>>': escape_latex(config.get('FOOTER_TEXT', '')),
+        '<<PARTNER_LOGO>>': config.get('PARTNER_LOGO', 'logos/partner.png'),
+        '<<TRAINER_TABLE>>': generate_trainer_table(config)
+    }
+
+    for i in range(1, 5):
+        replacements[f'<<TRAINER{i}>>'] = escape_latex(config.get(f'TRAINER{i}', ''))
+        replacements[f'<<TRAINER_TITLE_{i}>>'] = escape_latex(config.get(f'TRAINER_TITLE_{i}', ''))
+
+    return replacements
+
+def get_config_replacements(config):
+    """Session-cached wrapper around _build_config_replacements.
+
+    The script reruns on every interaction, so the escaped config is
+    stashed in st.session_state and rebuilt only when the config
+    fingerprint changes. Worker processes call the plain builder since
+    they have no session.
+    """
+    fingerprint = tuple(sorted(config.items()))
+    if st.session_state.get('_config_replacements_key') != fingerprint:
+        st.session_state['_config_replacements'] = _build_config_replacements(config)
+        st.session_state['_config_replacements_key'] = fingerprint
+    return st.session_state['_config_replacements']
 
 def main():
     st.set_page_config(
@@ -347,15 +508,19 @@ def main():
                     # Define the target path as partner.png
                     logo_path = os.path.join(LOGOS_DIR, "partner.png")
                     
-                    # Save the uploaded file as partner.png
+                    # Save the uploaded file as partner.png, streaming in
+                    # chunks rather than materialising the whole upload
+                    uploaded_file.seek(0)
                     with open(logo_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+                        shutil.copyfileobj(uploaded_file, f)
 
                     st.success("Partner logo has been updated successfully!")
 
-                    # Update config to use this logo
-                    config['PARTNER_LOGO'] = "logos/partner.png"
-                    save_workshop_config(config, participants)
+                    # Update config to use this logo, skipping the file
+                    # rewrite when it already points there
+                    if config.get('PARTNER_LOGO') != "logos/partner.png":
+                        config['PARTNER_LOGO'] = "logos/partner.png"
+                        save_workshop_config(config, participants)
 
         with col2:
             st.subheader("Current Partner Logo")
@@ -384,8 +549,17 @@ def main():
         with col1:
             st.subheader("Current Participants")
             if participants:
-                for i, participant in enumerate(participants):
-                    st.text(f"{i+1}. {participant}")
+                # One virtualized dataframe widget instead of a st.text
+                # widget per participant
+                import pandas as pd
+                st.dataframe(
+                    pd.DataFrame({
+                        '#': range(1, len(participants) + 1),
+                        'Name': participants
+                    }),
+                    hide_index=True,
+                    use_container_width=True
+                )
             else:
                 st.info("No participants added yet.")
 
@@ -456,11 +630,25 @@ def main():
         if uploaded_file is not None:
             try:
                 # Process the file
-                if uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
-                    # Handle Excel file
+                if uploaded_file.name.lower().endswith('.xlsx'):
+                    # Stream just the first column with openpyxl instead of
+                    # loading the whole sheet (and pandas) for a name list
+                    from openpyxl import load_workbook
+                    wb = load_workbook(uploaded_file, read_only=True, data_only=True)
+                    new_participants = [
+                        str(row[0]).strip()
+                        for row in wb.active.iter_rows(values_only=True)
+                        if row and row[0] is not None and str(row[0]).strip()
+                    ]
+                    wb.close()
+                elif uploaded_file.name.lower().endswith('.xls'):
+                    # Legacy .xls format still goes through pandas; only the
+                    # first column is parsed, straight to str so pandas skips
+                    # dtype inference on what is always a name list
                     import pandas as pd
-                    df = pd.read_excel(uploaded_file, header=None)
-                    new_participants = [str(name).strip() for name in df[0].dropna() if str(name).strip()]
+                    df = pd.read_excel(uploaded_file, header=None,
+                                       usecols=[0], dtype=str)
+                    new_participants = [name.strip() for name in df[0].dropna() if name.strip()]
                 else:
                     # Handle text file
                     content = uploaded_file.getvalue().decode('utf-8')
@@ -469,12 +657,17 @@ def main():
                 if new_participants:
                     st.success(f"Found {len(new_participants)} participants in the file")
                     
-                    # Show preview
+                    # Show preview as one element; st.text keeps names
+                    # literal (no Markdown meaning for _, * or #) and a
+                    # single element renders faster than one call per line
                     with st.expander("Preview first 5 participants"):
-                        for i, name in enumerate(new_participants[:5], 1):
-                            st.text(f"{i}. {name}")
+                        preview_lines = [
+                            f"{i}. {name}"
+                            for i, name in enumerate(new_participants[:5], 1)
+                        ]
                         if len(new_participants) > 5:
-                            st.text(f"... and {len(new_participants) - 5} more")
+                            preview_lines.append(f"... and {len(new_participants) - 5} more")
+                        st.text("\n".join(preview_lines))
                     
                     # Add form for the import button
                     with st.form("confirm_import_form"):
@@ -514,88 +707,52 @@ def main():
                     with st.spinner("Generating preview..."):
                         # Generate a temporary PDF for preview
                         import base64
-                        import tempfile
-                        from pathlib import Path
-
-                        # Create a temporary directory for the preview
-                        with tempfile.TemporaryDirectory() as temp_dir:
-                            # Generate LaTeX content
-                            latex_content = generate_certificate_preview(sample_participant, config)
-                            
-                            # Copy all necessary files to the temporary directory
-                            import shutil
-
-                            # Create necessary subdirectories in the temp dir
-                            temp_logo_dir = Path(temp_dir) / "logos"
-                            temp_logo_dir.mkdir(exist_ok=True, parents=True)
-                            
-                            # Copy all logo files
-                            logo_dir = Path("logos")
-                            if logo_dir.exists():
-                                for logo_file in logo_dir.glob("*"):
-                                    if logo_file.is_file():
-                                        shutil.copy2(logo_file, temp_logo_dir / logo_file.name)
-                            
-                            # Handle the partner logo path
-                            partner_logo = config.get('PARTNER_LOGO', 'logos/partner.png')
-                            if os.path.exists(partner_logo):
-                                shutil.copy2(partner_logo, temp_logo_dir / os.path.basename(partner_logo))
-                            
-                            # Update image paths in the LaTeX content to use relative paths
-                            # This ensures LaTeX can find the logo files in the temp directory
+
+                        # Persistent working directory with the logos copied
+                        # in; rebuilt only when the logo files change
+                        temp_dir = _preview_workdir(logos_fingerprint())
+
+                        # Generate LaTeX content
+                        latex_content = generate_certificate_preview(sample_participant, config)
+
+                        # A partner logo configured outside logos/ is copied
+                        # into the working directory and its path rewritten
+                        # to the copy; paths under logos/ already resolve
+                        # relative to the working directory
+                        partner_logo = config.get('PARTNER_LOGO', 'logos/partner.png')
+                        if not partner_logo.startswith(f'{LOGOS_DIR}/') and os.path.exists(partner_logo):
+                            partner_logo_name = os.path.basename(partner_logo)
+                            shutil.copy2(partner_logo, temp_dir / 'logos' / partner_logo_name)
                             latex_content = latex_content.replace(
-                                'includegraphics{logos/',
-                                'includegraphics{./logos/}'
+                                partner_logo, f'{LOGOS_DIR}/{partner_logo_name}'
                             )
-                            
-                            # Also update the partner logo path if it's different
-                            if '<<PARTNER_LOGO>>' in latex_content:
-                                partner_logo_name = os.path.basename(partner_logo)
-                                latex_content = latex_content.replace(
-                                    '<<PARTNER_LOGO>>',
-                                    f'./logos/{partner_logo_name}'
-                                )
-                            
-                            # Save LaTeX to a temporary file
-                            temp_tex = Path(temp_dir) / "preview.tex"
-                            with open(temp_tex, 'w', encoding='utf-8') as f:
-                                f.write(latex_content)
-                            
-                            try:
-                                # Compile LaTeX to PDF (run twice to ensure references are resolved)
-                                # First compilation
-                                result = subprocess.run(
-                                    ['pdflatex', '-interaction=nonstopmode', '-output-directory', str(temp_dir), 'preview.tex'],
-                                    cwd=temp_dir,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE,
-                                    text=True
-                                )
-                                
-                                # Second compilation to resolve references
-                                result = subprocess.run(
-                                    ['pdflatex', '-interaction=nonstopmode', '-output-directory', str(temp_dir), 'preview.tex'],
-                                    cwd=temp_dir,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE,
-                                    text=True
-                                )
-                                # Check if PDF was generated
-                                pdf_path = temp_tex.with_suffix('.pdf')
-                                if pdf_path.exists():
-                                    # Display the PDF
-                                    with open(pdf_path, "rb") as f:
-                                        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-                                        pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="700" type="application/pdf"></iframe>'
-                                        st.markdown(pdf_display, unsafe_allow_html=True)
-                                else:
-                                    st.error("Failed to generate PDF preview. Showing LaTeX code instead.")
-                                    st.code(latex_content, language='latex')
-                                    
-                            except subprocess.CalledProcessError as e:
-                                st.error(f"Error generating PDF preview: {e.stderr.decode()}")
+
+                        # Save LaTeX to a temporary file
+                        temp_tex = temp_dir / "preview.tex"
+                        with open(temp_tex, 'w', encoding='utf-8') as f:
+                            f.write(latex_content)
+
+                        try:
+                            # Compile LaTeX to PDF (rerun only if needed);
+                            # the workdir persists across reruns, so a stale
+                            # preview.pdf from an earlier success must not
+                            # mask a failed compile
+                            pdf_path = temp_tex.with_suffix('.pdf')
+                            result = _run_pdflatex(temp_tex, temp_dir, cwd=temp_dir)
+                            if result.returncode == 0 and pdf_path.exists():
+                                # Display the PDF
+                                with open(pdf_path, "rb") as f:
+                                    base64_pdf = base64.b64encode(f.read()).decode('utf-8')
+                                    pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="700" type="application/pdf"></iframe>'
+                                    st.markdown(pdf_display, unsafe_allow_html=True)
+                            else:
+                                st.error("Failed to generate PDF preview. Showing LaTeX code instead.")
                                 st.code(latex_content, language='latex')
 
+                        except subprocess.CalledProcessError as e:
+                            st.error(f"Error generating PDF preview: {e.stderr.decode()}")
+                            st.code(latex_content, language='latex')
+
         with col2:
             st.subheader("Generate Certificates")
 
@@ -606,49 +763,21 @@ def main():
             # Generate All Certificates button
             if st.button("Generate All Certificates", type="primary", use_container_width=True):
                 with st.spinner("Generating certificates..."):
-                    success_count = 0
-                    for participant in participants:
-                        if generate_single_certificate(participant, config):
-                            success_count += 1
+                    success_count = generate_certificates_batch(participants, config)
                     st.success(f"Generated {success_count} out of {len(participants)} certificates successfully!")
                     st.rerun()  # Refresh to show the new PDFs
+
+            # Generate just the participant selected for preview
+            if st.button(f"Generate Certificate for {sample_participant}", use_container_width=True):
+                with st.spinner(f"Generating certificate for {sample_participant}..."):
+                    if generate_single_certificate(sample_participant, config):
+                        st.success(f"Generated certificate for {sample_participant}!")
+                        st.rerun()  # Refresh to show the new PDF
             
             st.markdown("---")  # Add a horizontal line for separation
-            
+
             # Download section - moved below Generate button
-            if os.path.exists(PDFS_DIR):
-                pdf_files = sorted(
-                    [f for f in os.listdir(PDFS_DIR) if f.endswith('.pdf')],
-                    key=lambda x: os.path.getmtime(os.path.join(PDFS_DIR, x)),
-                    reverse=True
-                )
-                
-                if pdf_files:
-                    st.subheader("Download Certificates")
-                    
-                    # Download all button
-                    import io
-                    import zipfile
-                    
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                        for pdf_file in pdf_files:
-                            pdf_path = os.path.join(PDFS_DIR, pdf_file)
-                            zipf.write(pdf_path, pdf_file)
-                    
-                    zip_buffer.seek(0)
-                    st.download_button(
-                        label="Download All Certificates as ZIP",
-                        data=zip_buffer,
-                        file_name="all_certificates.zip",
-                        mime="application/zip",
-                        key="download_all_zip",
-                        use_container_width=True
-                    )
-                    
-                    # Show count of available certificates
-                    st.markdown(f"*{len(pdf_files)} certificates available for download*")
-                    st.markdown("*Click the button above to download all certificates as a ZIP file*")
+            _download_panel()
 
     elif page == "Settings":
         st.header("Settings")
@@ -676,88 +805,309 @@ def main():
         Requires LaTeX installation for PDF generation.
         """)
 
+@st.cache_data(show_spinner=False)
+def _build_certificates_zip(fingerprint):
+    """Build a ZIP of the given (pdf name, mtime) entries, returning its path.
+
+    Cached on the fingerprint, so reruns reuse the archive until a PDF
+    changes. The archive is written to a temporary file rather than an
+    in-memory buffer, keeping peak memory flat regardless of how many
+    certificates are bundled, and PDFs barely compress so entries are
+    stored rather than re-deflated.
+    """
+    import tempfile
+    import zipfile
+
+    fd, zip_path = tempfile.mkstemp(prefix='certificates_', suffix='.zip')
+    with os.fdopen(fd, 'wb') as stream:
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as zipf:
+            for pdf_file, _mtime in fingerprint:
+                zipf.write(os.path.join(PDFS_DIR, pdf_file), pdf_file)
+    return zip_path
+
+@st.fragment
+def _download_panel():
+    """Download section of the Preview & Generate page.
+
+    Runs as a fragment so interacting with the download button reruns
+    only this block, not the whole script - in particular not the
+    preview compile in the other column.
+    """
+    if not os.path.exists(PDFS_DIR):
+        return
+
+    # One scandir pass; DirEntry.stat() reuses the data from the
+    # directory read instead of issuing a stat per file
+    with os.scandir(PDFS_DIR) as it:
+        pdf_entries = [
+            (entry.name, entry.stat().st_mtime)
+            for entry in it
+            if entry.is_file() and entry.name.endswith('.pdf')
+        ]
+    pdf_entries.sort(key=lambda e: e[1], reverse=True)
+    pdf_files = [name for name, _mtime in pdf_entries]
+
+    if pdf_files:
+        st.subheader("Download Certificates")
+
+        # Download all button; the fingerprint keys the cache so
+        # the archive is only rebuilt when a PDF changes
+        fingerprint = tuple(pdf_entries)
+        zip_path = _build_certificates_zip(fingerprint)
+        if not os.path.exists(zip_path):
+            # A previous session's entry pointing at a deleted file
+            _build_certificates_zip.clear()
+            zip_path = _build_certificates_zip(fingerprint)
+
+        # Drop the superseded archive so long sessions don't pile
+        # stale ZIPs up in the temp dir
+        previous = st.session_state.get('_certificates_zip_path')
+        if previous and previous != zip_path:
+            Path(previous).unlink(missing_ok=True)
+        st.session_state['_certificates_zip_path'] = zip_path
+
+        with open(zip_path, 'rb') as f:
+            zip_bytes = f.read()
+        st.download_button(
+            label="Download All Certificates as ZIP",
+            data=zip_bytes,
+            file_name="all_certificates.zip",
+            mime="application/zip",
+            key="download_all_zip",
+            use_container_width=True
+        )
+
+        # Show count of available certificates
+        st.markdown(f"*{len(pdf_files)} certificates available for download*")
+        st.markdown("*Click the button above to download all certificates as a ZIP file*")
+
+def _prune_pdf_cache(max_entries=512):
+    """Drop the oldest cached PDFs once the cache grows past max_entries."""
+    with os.scandir(PDF_CACHE_DIR) as it:
+        entries = [(e.stat().st_mtime, e.path) for e in it if e.is_file()]
+    if len(entries) > max_entries:
+        entries.sort()
+        for _mtime, path in entries[:len(entries) - max_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+def _validate_generation_setup(config):
+    """One-time checks before generating: directories and partner logo.
+
+    Returns an error message, or None when everything is in place.
+    Hoisted out of the per-participant worker so a batch pays for these
+    stat calls once, not once per certificate.
+    """
+    ensure_directories()
+    partner_logo = config.get('PARTNER_LOGO', 'logos/partner.png')
+    if not os.path.exists(partner_logo):
+        return f"Partner logo not found at: {partner_logo}"
+    return None
+
 def generate_single_certificate(participant_name, config):
     """Generate a single certificate for the given participant."""
+    error = _validate_generation_setup(config)
+    if error is None:
+        success, error = _generate_certificate_pdf(participant_name, config)
+    else:
+        success = False
+    if error:
+        st.error(error)
+    return success
+
+def _generate_certificate_pdf(participant_name, config):
+    """Compile one certificate PDF, returning (success, error_message).
+
+    Kept free of Streamlit calls so it can run in a worker process.
+    The caller is responsible for _validate_generation_setup.
+    """
     try:
-        with open(TEMPLATE_FILE, 'r', encoding='utf-8') as file:
-            content = file.read()
-
-        trainer_table = generate_trainer_table(config)
-        
-        # Handle partner logo path
-        partner_logo = config.get('PARTNER_LOGO', 'logos/partner.png')
-        
-        # Make sure the logos directory exists
-        logo_dir = Path('logos')
-        logo_dir.mkdir(exist_ok=True)
-        
-        # Make sure the partner logo exists
-        if not os.path.exists(partner_logo):
-            st.warning(f"Partner logo not found at: {partner_logo}")
-            return False
+        content = _load_template(TEMPLATE_FILE, os.path.getmtime(TEMPLATE_FILE))
 
         replacements = {
+            **_build_config_replacements(config),
             '<<PARTICIPANT_NAME>>': escape_latex(participant_name),
-            '<<CERTIFICATE_NAME>>': escape_latex(config.get('CERTIFICATE_NAME', 'Certificate of Achievement')),
-            '<<WORKSHOP_NAME>>': escape_latex(config.get('WORKSHOP_NAME', 'Workshop')),
-            '<<START_DATE>>': escape_latex(config.get('START_DATE', '')),
-            '<<END_DATE>>': escape_latex(config.get('END_DATE', '')),
-            '<<YEAR>>': escape_latex(config.get('YEAR', '')),
-            '<<FOOTER_TEXT>>': escape_latex(config.get('FOOTER_TEXT', '')),
-            '<<PARTNER_LOGO>>': partner_logo,  # Use the original path
-            '<<TRAINER_TABLE>>': trainer_table
         }
 
-        for i in range(1, 5):
-            replacements[f'<<TRAINER{i}>>'] = escape_latex(config.get(f'TRAINER{i}', ''))
-            replacements[f'<<TRAINER_TITLE_{i}>>'] = escape_latex(config.get(f'TRAINER_TITLE_{i}', ''))
-
-        for placeholder, value in replacements.items():
-            content = content.replace(placeholder, value)
+        content = render_template(content, replacements)
 
-        # Create output directory if it doesn't exist
         output_dir = Path(PDFS_DIR)
-        output_dir.mkdir(exist_ok=True, parents=True)
 
         # Create a safe filename from the participant's name
-        safe_filename = ''.join(c if c.isalnum() else '_' for c in participant_name)
-        base_filename = f'certificate_{safe_filename.upper()}'
+        base_filename = safe_base_filename(participant_name)
         tex_file = output_dir / f'{base_filename}.tex'
+        pdf_file = output_dir / f'{base_filename}.pdf'
+
+        # The rendered source plus the logo fingerprint identifies the
+        # output exactly, so a previously compiled PDF can be reused
+        cached_pdf = pdf_cache_path(content)
+        if cached_pdf.exists():
+            shutil.copy2(cached_pdf, pdf_file)
+            return True, ""
 
         # Write the modified content to the file in the output directory
         with open(tex_file, 'w', encoding='utf-8') as f:
             f.write(content)
 
         # Compile the LaTeX file to PDF from the project root directory
-        for _ in range(2):  # Run twice to ensure references are resolved
-            result = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', f'-output-directory={output_dir}', str(tex_file)],
-                cwd='.',  # Run from project root so it can find the logos directory
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode != 0:
-                st.error(f"Error generating certificate for {participant_name}")
-                if result.stderr:
-                    st.text("LaTeX Error:")
-                    st.text(result.stderr)
-                return False
+        # (run from project root so pdflatex can find the logos directory)
+        result = _run_pdflatex(tex_file, output_dir, cwd='.')
+        if result.returncode != 0:
+            error = f"Error generating certificate for {participant_name}"
+            if result.stderr:
+                error += f"\nLaTeX Error:\n{result.stderr}"
+            return False, error
+
+        # Store the fresh PDF so identical future requests skip pdflatex
+        if pdf_file.exists():
+            try:
+                shutil.copy2(pdf_file, cached_pdf)
+                _prune_pdf_cache()
+            except OSError:
+                pass
 
         # Clean up auxiliary files in the output directory
         for ext in ['.aux', '.log', '.out', '.tex']:
-            aux_file = output_dir / f'{base_filename}{ext}'
-            if aux_file.exists() and aux_file.is_file():
-                try:
-                    aux_file.unlink()
-                except Exception as e:
-                    logger.warning(f"Could not remove {aux_file}: {e}")
+            try:
+                (output_dir / f'{base_filename}{ext}').unlink(missing_ok=True)
+            except OSError:
+                pass
 
-        return True
+        return True, ""
 
     except Exception as e:
-        st.error(f"Error generating certificate for {participant_name}: {str(e)}")
-        return False
+        return False, f"Error generating certificate for {participant_name}: {str(e)}"
+
+def generate_certificates_batch(participants, config):
+    """Generate certificates for all participants, returning the success count.
+
+    When pdfseparate is available the certificates are compiled as a single
+    combined document (one pdflatex startup for the whole batch instead of
+    one per participant) and the resulting pages are split into the usual
+    per-participant PDFs. Otherwise each certificate is compiled on its own,
+    spread across a process pool.
+    """
+    error = _validate_generation_setup(config)
+    if error:
+        st.error(error)
+        return 0
+
+    if not shutil.which('pdfseparate'):
+        return _generate_certificates_parallel(participants, config)
+
+    try:
+        template = _load_template(TEMPLATE_FILE, os.path.getmtime(TEMPLATE_FILE))
+
+        # Everything except the participant name is constant for the batch
+        fixed_replacements = get_config_replacements(config)
+
+        preamble = None
+        bodies = []
+        for participant in participants:
+            replacements = {
+                **fixed_replacements,
+                '<<PARTICIPANT_NAME>>': escape_latex(participant),
+            }
+            content = render_template(template, replacements)
+
+            # Each certificate becomes one page of the combined document
+            head, _, rest = content.partition(r'\begin{document}')
+            body, _, _ = rest.rpartition(r'\end{document}')
+            if preamble is None:
+                preamble = head
+            bodies.append(body.strip())
+
+        combined = (
+            preamble
+            + '\\begin{document}\n\n'
+            + '\n\\clearpage\n\n'.join(bodies)
+            + '\n\n\\end{document}\n'
+        )
+
+        output_dir = Path(PDFS_DIR)
+        output_dir.mkdir(exist_ok=True, parents=True)
+        batch_base = 'certificate_batch'
+        tex_file = output_dir / f'{batch_base}.tex'
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(combined)
+
+        result = _run_pdflatex(tex_file, output_dir, cwd='.')
+        if result.returncode != 0:
+            st.error("Error compiling the certificate batch; falling back to one-by-one generation")
+            return _generate_certificates_parallel(participants, config)
+
+        # Split the combined PDF back into one file per participant
+        batch_pdf = output_dir / f'{batch_base}.pdf'
+        result = subprocess.run(
+            ['pdfseparate', str(batch_pdf), str(output_dir / f'{batch_base}_page_%d.pdf')],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            st.error("Error splitting the certificate batch; falling back to one-by-one generation")
+            return _generate_certificates_parallel(participants, config)
+
+        # The split is only trustworthy when one certificate produced
+        # exactly one page; an overflowing certificate (long wrapped
+        # name, wide trainer table) would shift every later page onto
+        # the wrong participant
+        page_pdfs = list(output_dir.glob(f'{batch_base}_page_*.pdf'))
+        if len(page_pdfs) != len(participants):
+            for page_pdf in page_pdfs:
+                page_pdf.unlink(missing_ok=True)
+            for ext in ['.aux', '.log', '.out', '.tex', '.pdf']:
+                (output_dir / f'{batch_base}{ext}').unlink(missing_ok=True)
+            st.error("Batch page count doesn't match the participant list; falling back to one-by-one generation")
+            return _generate_certificates_parallel(participants, config)
+
+        success_count = 0
+        for page, participant in enumerate(participants, start=1):
+            page_pdf = output_dir / f'{batch_base}_page_{page}.pdf'
+            if page_pdf.exists():
+                page_pdf.replace(output_dir / f'{safe_base_filename(participant)}.pdf')
+                success_count += 1
+
+        # Clean up the combined document's files
+        for ext in ['.aux', '.log', '.out', '.tex', '.pdf']:
+            (output_dir / f'{batch_base}{ext}').unlink(missing_ok=True)
+
+        return success_count
+
+    except Exception as e:
+        st.error(f"Error generating certificate batch: {str(e)}")
+        return 0
+
+def _generate_certificates_parallel(participants, config):
+    """Compile one certificate per participant across a process pool.
+
+    Each pdflatex run is CPU-bound and independent, so the batch scales
+    with the core count. Progress is streamed to a st.progress bar as
+    workers finish.
+    """
+    progress = st.progress(0.0)
+    success_count = 0
+    errors = []
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_generate_certificate_pdf, participant, config)
+            for participant in participants
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            success, error = future.result()
+            if success:
+                success_count += 1
+            elif error:
+                errors.append(error)
+            progress.progress(done / len(futures))
+
+    progress.empty()
+    for error in errors:
+        st.error(error)
+
+    return success_count
 
 if __name__ == "__main__":
     main()
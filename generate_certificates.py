@@ -1,64 +1,55 @@
+import argparse
+import multiprocessing
 import os
 import shutil
 import subprocess
+import tempfile
 from pathlib import Path
 
+from cert_core import (
+    escape_latex,
+    pdf_cache_path,
+    render_template,
+    run_pdflatex_passes,
+    safe_base_filename,
+)
+
 
 def read_workshop_config(filename='workshop_info.txt'):
     """Read workshop configuration from file.
     Returns a tuple of (config_dict, participants_list)
     """
-    config = {}
-    participants = []
-    in_participants_section = False
-    
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                    
-                if line.startswith('===') and 'Participant' in line:
-                    in_participants_section = True
-                    continue
-                    
-                if '=' in line and not in_participants_section:
-                    key, value = line.split('=', 1)
-                    config[key.strip()] = value.strip()
-                elif in_participants_section and line and not line.startswith('=='):
-                    participants.append(line.strip())
-        
+        lines = [
+            line.strip()
+            for line in Path(filename).read_text(encoding='utf-8').splitlines()
+        ]
+
+        # Locate the participant-section sentinel once
+        sep = next(
+            (i for i, line in enumerate(lines)
+             if line.startswith('===') and 'Participant' in line),
+            len(lines)
+        )
+
+        config = {
+            key.strip(): value.strip()
+            for key, value in (
+                line.split('=', 1) for line in lines[:sep]
+                if line and not line.startswith('#') and '=' in line
+            )
+        }
+        participants = [
+            line for line in lines[sep + 1:]
+            if line and not line.startswith(('#', '=='))
+        ]
+
         return config, participants
-        
+
     except Exception as e:
         print(f"Error reading {filename}: {str(e)}")
         return None, None
 
-def escape_latex(text):
-    """Escape special LaTeX characters in the given text."""
-    if not text:
-        return ""
-    
-    # First replace backslashes, then other special characters
-    replacements = {
-        '\\': '\textbackslash{}',
-        '&': '\&',
-        '%': '\%',
-        '$': '\$',
-        '#': '\#',
-        '_': '\_',
-        '{': '\{',
-        '}': '\}',
-        '~': '\textasciitilde{}',
-        '^': '\textasciicircum{}',
-    }
-    
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    
-    return text
-
 def generate_trainer_table(config):
     """Generate LaTeX table for 1-4 trainers with dynamic column widths."""
     # Collect all trainers
@@ -104,18 +95,13 @@ def generate_trainer_table(config):
     
     return "\n".join(table)
 
-def generate_certificate(participant_name, config):
-    """Generate a certificate for the given participant using the provided config."""
-    # Read the template
-    with open('certificate.tex', 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    # Generate the trainer table
-    trainer_table = generate_trainer_table(config)
-    
-    # Prepare replacements
+def build_base_replacements(config):
+    """Build the placeholder replacements shared by every certificate.
+
+    Everything except the participant name depends only on the config,
+    so escaping it once per batch beats once per participant.
+    """
     replacements = {
-        '<<PARTICIPANT_NAME>>': escape_latex(participant_name),
         '<<CERTIFICATE_NAME>>': escape_latex(config.get('CERTIFICATE_NAME', 'Certificate of Achievement')),
         '<<WORKSHOP_NAME>>': escape_latex(config.get('WORKSHOP_NAME', 'Workshop')),
         '<<START_DATE>>': escape_latex(config.get('START_DATE', '')),
@@ -123,74 +109,198 @@ def generate_certificate(participant_name, config):
         '<<YEAR>>': escape_latex(config.get('YEAR', '')),
         '<<FOOTER_TEXT>>': escape_latex(config.get('FOOTER_TEXT', '')),
         '<<PARTNER_LOGO>>': config.get('PARTNER_LOGO', 'logos/partner.png'),
-        '<<TRAINER_TABLE>>': trainer_table
+        '<<TRAINER_TABLE>>': generate_trainer_table(config)
     }
-    
+
     # Add trainer placeholders for backward compatibility (though they won't be used in the template)
     for i in range(1, 5):
         replacements[f'<<TRAINER{i}>>'] = escape_latex(config.get(f'TRAINER{i}', ''))
         replacements[f'<<TRAINER_TITLE_{i}>>'] = escape_latex(config.get(f'TRAINER_TITLE_{i}', ''))
-    
-    # Apply all replacements
-    for placeholder, value in replacements.items():
-        content = content.replace(placeholder, value)
-    
+
+    return replacements
+
+def prepare_preamble_format():
+    """Precompile the template preamble into certfmt.fmt with mylatexformat.
+
+    Package loading dominates a one-page compile, so dumping the
+    preamble once lets every certificate start from the predigested
+    format. The .fmt persists next to the template and is rebuilt only
+    when certificate.tex is newer. Returns the format path, or None
+    when the dump fails (e.g. mylatexformat is not installed), in which
+    case compiles fall back to plain pdflatex.
+    """
+    fmt_file = Path('certfmt.fmt')
+    try:
+        if fmt_file.stat().st_mtime > os.path.getmtime('certificate.tex'):
+            return os.path.abspath(fmt_file)
+    except OSError:
+        pass
+
+    try:
+        result = subprocess.run(
+            ['pdflatex', '-ini', '-interaction=nonstopmode', '-jobname=certfmt',
+             '&pdflatex', 'mylatexformat.ltx', 'certificate.tex'],
+            cwd='.',
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        # No pdflatex on PATH; let the workers report that per
+        # participant instead of dying before the batch starts
+        return None
+    if result.returncode == 0 and fmt_file.exists():
+        return os.path.abspath(fmt_file)
+    return None
+
+def generate_certificate(participant_name, config, template_content=None,
+                         base_replacements=None, use_cache=True,
+                         fmt_file=None):
+    """Generate a certificate for the given participant using the provided config.
+
+    The caller can pass the template text and the prebuilt config
+    replacements so a batch reads the file and escapes the config once
+    instead of once per participant.
+    """
+    if template_content is None:
+        with open('certificate.tex', 'r', encoding='utf-8') as file:
+            template_content = file.read()
+    content = template_content
+
+    if base_replacements is None:
+        base_replacements = build_base_replacements(config)
+    replacements = {
+        **base_replacements,
+        '<<PARTICIPANT_NAME>>': escape_latex(participant_name),
+    }
+
+    # Apply all replacements in a single pass over the template; tokens
+    # without an entry are left untouched
+    content = render_template(content, replacements)
+
     # Create output directory if it doesn't exist
     output_dir = Path('pdfs')
     output_dir.mkdir(exist_ok=True)
-    
-    # Create a safe filename from the participant's name
-    safe_filename = ''.join(c if c.isalnum() else '_' for c in participant_name)
-    base_filename = f'certificate_{safe_filename.upper()}'
-    tex_file = Path(f'{base_filename}.tex')
-    
-    # Write the modified content to the temporary file in the current directory
-    with open(tex_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
+
+    base_filename = safe_base_filename(participant_name)
+
+    # An unchanged certificate is served from the cache without touching
+    # pdflatex at all
+    cache_pdf = pdf_cache_path(content) if use_cache else None
+    if cache_pdf is not None and cache_pdf.exists():
+        shutil.copy(cache_pdf, output_dir / f'{base_filename}.pdf')
+        print(f"Reused cached certificate for: {participant_name}")
+        return True
+
+    # Compile in a scratch directory - a RAM disk when the platform has
+    # one - so the .tex and aux files never touch the real filesystem;
+    # only the finished PDF is moved into the output directory
+    scratch = Path(tempfile.mkdtemp(
+        dir='/dev/shm' if os.path.isdir('/dev/shm') else None
+    ))
+    tex_file = scratch / f'{base_filename}.tex'
+
+    # The content is a ready string: encode once and write through a raw
+    # fd, skipping the text-mode wrapper and its buffering
+    fd = os.open(tex_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content.encode('utf-8'))
+    finally:
+        os.close(fd)
+
     # Compile the LaTeX file to PDF
     try:
-        # Run pdflatex twice to ensure references are resolved
-        for _ in range(2):
-            result = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', f'-output-directory={output_dir}', str(tex_file)],
-                cwd='.',
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                print(f"Error generating certificate for {participant_name}:")
-                print("LaTeX Error Output:")
-                print(result.stderr)
-                print("LaTeX Output:")
-                print(result.stdout)
-                return False
-        
-        # Move the generated PDF to the output directory
-        pdf_source = Path(f'{base_filename}.pdf')
+        # Compile against the precompiled preamble format when there is
+        # one, retrying from scratch if the format turns out stale; on
+        # failure the log tail carries the error, since batchmode keeps
+        # the actual diagnostics in the .log
+        log_file = scratch / f'{base_filename}.log'
+        result = run_pdflatex_passes(tex_file, scratch, fmt_file=fmt_file)
+        if result.returncode != 0 and fmt_file:
+            result = run_pdflatex_passes(tex_file, scratch)
+        if result.returncode != 0:
+            print(f"Error generating certificate for {participant_name}:")
+            try:
+                with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+                    print(''.join(f.readlines()[-30:]))
+            except OSError:
+                print("(no pdflatex log available)")
+            return False
+
+        # Move the generated PDF to the output directory; a plain rename
+        # is one atomic syscall, with shutil.move as the copy fallback
+        # when the scratch dir (e.g. /dev/shm) is on another filesystem
+        pdf_source = scratch / f'{base_filename}.pdf'
         if pdf_source.exists():
-            shutil.move(str(pdf_source), str(output_dir / pdf_source.name))
-        
-        # Clean up auxiliary files from both current and output directories
-        for directory in ['.', output_dir]:
-            for ext in ['.aux', '.log', '.out', '.tex']:
-                aux_file = Path(directory) / f'{base_filename}{ext}'
-                if aux_file.exists() and aux_file.is_file():
-                    try:
-                        aux_file.unlink()
-                    except Exception as e:
-                        print(f"Warning: Could not remove {aux_file}: {str(e)}")
-        
+            pdf_dest = output_dir / pdf_source.name
+            try:
+                os.replace(pdf_source, pdf_dest)
+            except OSError:
+                shutil.move(str(pdf_source), str(pdf_dest))
+            if cache_pdf is not None:
+                shutil.copy(pdf_dest, cache_pdf)
+
         print(f"Successfully generated certificate for: {participant_name}")
         return True
-        
+
     except Exception as e:
         print(f"Unexpected error generating certificate for {participant_name}: {str(e)}")
         return False
 
+    finally:
+        # One rmtree replaces the per-extension cleanup loop
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+# Per-worker state installed once by the Pool initializer, so each task
+# pickles only the participant name instead of the template and the
+# escaped config dict
+_worker_template = None
+_worker_base_replacements = None
+_worker_use_cache = True
+_worker_fmt_file = None
+
+def _init_worker(template_content, base_replacements, use_cache, fmt_file):
+    """Pool initializer: stash the batch-wide state in the worker."""
+    global _worker_template, _worker_base_replacements, _worker_use_cache, \
+        _worker_fmt_file
+    _worker_template = template_content
+    _worker_base_replacements = base_replacements
+    _worker_use_cache = use_cache
+    _worker_fmt_file = fmt_file
+
+def _generate_in_worker(participant_name):
+    """Pool task: compile one certificate from the worker-local state."""
+    return generate_certificate(
+        participant_name, None,
+        template_content=_worker_template,
+        base_replacements=_worker_base_replacements,
+        use_cache=_worker_use_cache,
+        fmt_file=_worker_fmt_file,
+    )
+
+
+def _positive_int(value):
+    """argparse type for --jobs: an integer of at least 1."""
+    jobs = int(value)
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"invalid jobs value: {value!r} (must be >= 1)")
+    return jobs
+
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Generate LaTeX certificates for all workshop participants.'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=_positive_int, default=os.cpu_count(),
+        help='number of parallel pdflatex workers (default: CPU count)'
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='always recompile instead of reusing cached PDFs'
+    )
+    args = parser.parse_args()
+
     # Read configuration and participants from file
     config, participants = read_workshop_config()
     if not config or participants is None:
@@ -205,11 +315,29 @@ def main():
     print(f"Workshop: {config.get('WORKSHOP_NAME', 'N/A')}")
     print(f"Date: {config.get('START_DATE', 'N/A')} to {config.get('END_DATE', 'N/A')} {config.get('YEAR', '')}\n")
     
-    # Generate certificates for all participants
-    success_count = 0
-    for participant in participants:
-        if generate_certificate(participant, config):
-            success_count += 1
+    # Read the template once for the whole batch
+    try:
+        with open('certificate.tex', 'r', encoding='utf-8') as f:
+            template_content = f.read()
+    except OSError as e:
+        print(f"Error reading certificate.tex: {str(e)}")
+        return
+
+    # Generate certificates for all participants in parallel; each
+    # pdflatex run is CPU-bound and independent, so the batch scales
+    # with the core count
+    with multiprocessing.Pool(
+        processes=args.jobs,
+        initializer=_init_worker,
+        initargs=(template_content, build_base_replacements(config),
+                  not args.no_cache, prepare_preamble_format()),
+    ) as pool:
+        # Batch several names per dispatch so IPC overhead is amortized;
+        # ~4 chunks per worker still balances uneven compile times
+        chunksize = max(1, len(participants) // (4 * (args.jobs or 1)))
+        results = pool.imap_unordered(_generate_in_worker, participants,
+                                      chunksize=chunksize)
+        success_count = sum(1 for success in results if success)
     
     print(f"\nSuccessfully generated {success_count} out of {len(participants)} certificates.")
     print(f"PDFs are available in the '{os.path.abspath('pdfs')}' directory.")